@@ -1,13 +1,45 @@
-from django.core.exceptions import SuspiciousOperation
-from django.db import transaction
-from django.db.models import Manager, Q
-from rest_framework.relations import ManyRelatedField
-from rest_framework.serializers import BaseSerializer, ListSerializer
-from rest_framework.utils import model_meta
-
-from pprint import pprint
+from collections import namedtuple
+from copy import copy, deepcopy
 
-__all__ = ["EmbeddedMixin", "OptionalFieldsMixin"]
+from django.db import transaction
+from django.db.models import Model, Prefetch
+from django.db.models.signals import post_save, pre_save
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer, ModelSerializer
+from rest_framework.utils.serializer_helpers import BindingDict
+from rest_framework.validators import UniqueValidator
+
+__all__ = ["EagerLoadingMixin", "EmbeddedMixin", "OptionalFieldsMixin"]
+
+# Default number of rows inserted per query when embedded resources are
+# created in bulk. Can be overridden with the Meta variable
+# `embedded_bulk_batch_size`.
+BULK_BATCH_SIZE = 1000
+
+# Everything `EmbeddedMixin.create()` and `EmbeddedMixin.update()` need to know
+# about an embedded field. `leaf` tells if its resources can be written in bulk,
+# see `EmbeddedMixin._is_bulk_writable()`.
+ResolvedEmbedded = namedtuple(
+  "ResolvedEmbedded",
+  "name serializer related_field_name related_pk_name related_model leaf",
+)
+
+def _get_lookup_field_name(lookup):
+  # Return the name of the serializer field a lookup starts with.
+  if isinstance(lookup, Prefetch) is True:
+    lookup = lookup.prefetch_through
+
+  return lookup.split("__", 1)[0]
+
+# Attributes of `ModelSerializer` that take part in building its fields. All
+# `get_*()` and `build_*()` hooks are included, even if they don't affect the
+# fields, to stay on the safe side.
+_FIELD_BUILDING_ATTRIBUTES = ["__init__", "fields", "include_extra_kwargs"] + [
+  name
+  for name in dir(ModelSerializer)
+  if name.startswith(("get_", "build_")) is True
+]
 
 class EmbeddedMixin(object):
   """
@@ -19,12 +51,49 @@ class EmbeddedMixin(object):
   are deleted if the ID is missing from the new data. If the embedded field is
   left out, nothing is changed at all.
 
-  Creating and updating is isolated in a database transaction.
+  Creating and updating is isolated in a database transaction, which is a
+  savepoint inside an outer transaction. Embedded serializers using
+  `EmbeddedMixin` run within the transaction of their parent and don't create
+  savepoints of their own.
+
+  The embedded fields are written one after another on the connection of that
+  transaction. They can't be written concurrently, because Django uses a
+  separate connection per thread, which would neither see the uncommitted
+  parent nor be rolled back with it.
 
   Which fields are used as embedded resources is determined by the Meta
   variable `embedded_fields`. You can pass extra kwargs arguments to the
   embedded serializers by setting them in `embedded_fields_extra_kwargs`.
 
+  New embedded resources are inserted with `bulk_create()` and existing ones
+  are written back with `bulk_update()`, in batches of
+  `embedded_bulk_batch_size` rows (default: 1000). Embedded serializers are
+  still saved one by one with their `create()`/`update()` if they use
+  `EmbeddedMixin` themselves, override `create()` or `update()`, or have
+  writable fields that aren't concrete model fields (like many-to-many
+  relations). The same goes for multi-table inherited models and models that
+  override `save()` or have `pre_save`/`post_save` receivers, as writing in
+  bulk would skip those. Set the Meta variable `embedded_bulk_write` to False
+  to always save embedded resources one by one. Fields with `auto_now` are
+  still refreshed when updating in bulk.
+
+  If an update only contains embedded resources, the instance itself isn't
+  saved. Its `save()` isn't called and no `pre_save`/`post_save` signals are
+  sent, so fields with `auto_now` (like an `updated_at` timestamp) aren't
+  touched either.
+
+  The fields of bulk-writable embedded serializers are generated once per
+  serializer class and copied for every new instance, unless the embedded
+  serializer overrides `__init__()`, `fields`, `include_extra_kwargs()` or any
+  `get_*()`/`build_*()` method of `ModelSerializer`, which might make the
+  fields depend on the context.
+
+  Embedded resources (including those of nested embedded serializers) are
+  fetched with `prefetch_related()` by `setup_eager_loading()`, which is called
+  automatically for reading requests of ViewSets using `EagerLoadingMixin`.
+  Additional lookups can be declared in the Meta variables
+  `select_related_fields` and `prefetch_related_fields`.
+
   Example:
 
   ```
@@ -37,6 +106,43 @@ class EmbeddedMixin(object):
   ```
   """
 
+  # Introspected embedded field setup, indexed by serializer class. The setup
+  # only depends on the class' Meta, so it's resolved once per class.
+  _embedded_meta_cache = {}
+
+  @classmethod
+  def _get_embedded_meta(cls):
+    embedded_meta = EmbeddedMixin._embedded_meta_cache.get(cls)
+
+    if embedded_meta is not None:
+      return embedded_meta
+
+    model = cls.Meta.model
+    extra_kwargs = getattr(cls.Meta, "extra_kwargs", {})
+    extra_embedded_kwargs = \
+      getattr(cls.Meta, "embedded_fields_extra_kwargs", {})
+    embedded_meta = {}
+
+    for field_name, serializer_class in cls.Meta.embedded_fields.items():
+      field_extra_kwargs = {}
+      field_extra_kwargs.update(extra_kwargs.get(field_name, {}))
+      field_extra_kwargs.update(extra_embedded_kwargs.get(field_name, {}))
+
+      related_pk_name = serializer_class.Meta.model._meta.pk.name
+      related_field_name = getattr(model, field_name).field.name
+
+      embedded_meta[field_name] = (
+        serializer_class, related_pk_name, related_field_name,
+        field_extra_kwargs,
+      )
+
+    EmbeddedMixin._embedded_meta_cache[cls] = embedded_meta
+    return embedded_meta
+
+  # Unbound copies of the fields of bulk-writable embedded serializers, indexed
+  # by serializer class and embedded field name.
+  _embedded_field_prototypes = {}
+
   def __init__(self, *args, **kwargs):
     super().__init__(*args, **kwargs)
 
@@ -47,16 +153,17 @@ class EmbeddedMixin(object):
     # no side effects.
     # Additionally, the context is being copied to the child serializers.
 
-    model = self.Meta.model
-    extra_kwargs = getattr(self.Meta, "extra_kwargs", {})
-    extra_embedded_kwargs = \
-      getattr(self.Meta, "embedded_fields_extra_kwargs", {})
     fields = self.fields
+    prototypes = \
+      EmbeddedMixin._embedded_field_prototypes.setdefault(type(self), {})
 
-    for field_name, serializer_class in self.Meta.embedded_fields.items():
-      field_extra_kwargs = {}
-      field_extra_kwargs.update(extra_kwargs.get(field_name, {}))
-      field_extra_kwargs.update(extra_embedded_kwargs.get(field_name, {}))
+    resolved_embedded = []
+
+    for field_name, embedded_meta in self._get_embedded_meta().items():
+      (
+        serializer_class, related_pk_name, related_field_name,
+        field_extra_kwargs,
+      ) = embedded_meta
 
       # Instantiate the new embedded serializer and overwrite over existing
       # field entry.
@@ -66,67 +173,252 @@ class EmbeddedMixin(object):
       fields[field_name] = field
 
       related_serializer = field.child
-      related_model = related_serializer.Meta.model
+      prototype_fields = prototypes.get(field_name)
+
+      if prototype_fields is None:
+        # Drop the related field in the related model now, as it's redundant
+        # and not required.
+        #
+        # For example, if `Order` contains `Item`, we don't want this:
+        #   {"id": 2, "items": [{"id": 1, "order": 2}, ...]}
+        #
+        # Instead we want this:
+        #   {"id": 2, "items": [{"id": 1}, ...]}
+
+        del related_serializer.fields[related_field_name]
+
+        is_leaf = self._is_bulk_writable(related_serializer)
+
+        if is_leaf is True and self._has_static_fields(related_serializer):
+          prototypes[field_name] = dict([
+            (name, deepcopy(related_field))
+            for name, related_field in related_serializer.fields.items()
+          ])
+      else:
+        # Copy the prototype fields instead of letting DRF generate them again.
+        # Like DRF's copies of declared fields, the copies are unbound. Only
+        # fields of bulk-writable serializers are prototyped.
+        related_fields = BindingDict(related_serializer)
+
+        for name, prototype_field in prototype_fields.items():
+          related_fields[name] = deepcopy(prototype_field)
+
+        related_serializer.fields = related_fields
+        is_leaf = True
 
       # Get related PK field and disable "read only" and set is as not
-      # required.
-      related_pk_name = related_model._meta.pk.name
+      # required. Writable PKs (like UUIDs with a default) come with a unique
+      # validator, which would reject the IDs of the existing resources.
       related_pk_field = related_serializer.fields[related_pk_name]
       related_pk_field.read_only = False
       related_pk_field.required = False
-
-      # Drop the related field in the related model now, as it's redundant and
-      # not required.
-      #
-      # For example, if `Order` contains `Item`, we don't want this:
-      #   {"id": 2, "items": [{"id": 1, "order": 2}, ...]}
-      #
-      # Instead we want this:
-      #   {"id": 2, "items": [{"id": 1}, ...]}
-
-      model_field = getattr(model, field_name)
-      related_field_name = model_field.field.name
-      del related_serializer.fields[related_field_name]
+      related_pk_field.validators = [
+        validator
+        for validator in related_pk_field.validators
+        if isinstance(validator, UniqueValidator) is False
+      ]
+
+      resolved_embedded.append(ResolvedEmbedded(
+        name=field_name,
+        serializer=related_serializer,
+        related_field_name=related_field_name,
+        related_pk_name=related_pk_name,
+        related_model=serializer_class.Meta.model,
+        leaf=is_leaf,
+      ))
 
       # The relation field itself is writable, but not required. If it's left
       # out, this mixin will simply ignore it.
       field.read_only = False
       field.required = False
 
-  def _get_relational_fields(self):
-    requested_fields = getattr(self.Meta, "embedded_fields", ())
+    self._resolved_embedded = tuple(resolved_embedded)
+
+  @classmethod
+  def get_prefetch_lookups(cls, dropped_fields=()):
+    """
+    Return the lookups to be prefetched for this serializer, which are all
+    embedded fields, all fields in `prefetch_related_fields` and the lookups of
+    nested embedded serializers. Lookups of `dropped_fields` are left out.
 
-    fields = dict([
-      (name, field)
-      for name, field in self.fields.items()
-      if name in requested_fields
-    ])
+    The `select_related_fields` of embedded serializers are applied to the
+    prefetch queries of their embedded fields.
+    """
+    lookups = []
+
+    for field_name, serializer_class in cls.Meta.embedded_fields.items():
+      if field_name in dropped_fields:
+        continue
 
-    return fields
+      select_related_fields = \
+        getattr(serializer_class.Meta, "select_related_fields", ())
+
+      if select_related_fields:
+        related_manager = serializer_class.Meta.model._default_manager
+        lookups.append(Prefetch(
+          field_name,
+          queryset=related_manager.select_related(*select_related_fields),
+        ))
+      else:
+        lookups.append(field_name)
+
+      if issubclass(serializer_class, EmbeddedMixin) is True:
+        for lookup in serializer_class.get_prefetch_lookups():
+          if isinstance(lookup, Prefetch) is True:
+            lookup = copy(lookup)
+            lookup.add_prefix(field_name)
+          else:
+            lookup = "{}__{}".format(field_name, lookup)
+
+          lookups.append(lookup)
+
+    # Additional lookups come last, as they might traverse embedded fields that
+    # are prefetched with a custom queryset.
+    lookups.extend(
+      lookup
+      for lookup in getattr(cls.Meta, "prefetch_related_fields", ())
+      if _get_lookup_field_name(lookup) not in dropped_fields
+    )
+
+    return lookups
+
+  @classmethod
+  def setup_eager_loading(cls, queryset, dropped_fields=()):
+    """
+    Apply `select_related()` and `prefetch_related()` to `queryset`, so
+    embedded resources don't cause an extra query per instance. Nothing is
+    loaded for `dropped_fields`, which are not part of the response.
+    """
+    select_related_fields = [
+      lookup
+      for lookup in getattr(cls.Meta, "select_related_fields", ())
+      if _get_lookup_field_name(lookup) not in dropped_fields
+    ]
+
+    if select_related_fields:
+      queryset = queryset.select_related(*select_related_fields)
+
+    return queryset.prefetch_related(*cls.get_prefetch_lookups(dropped_fields))
+
+  def _is_bulk_writable(self, related_serializer):
+    if getattr(self.Meta, "embedded_bulk_write", True) is False:
+      return False
+
+    # Embedded resources can only be written in bulk if they don't have
+    # embedded resources themselves, as those need the saved instance.
+    if isinstance(related_serializer, EmbeddedMixin) is True:
+      return False
+
+    # Django can't bulk create multi-table inherited models.
+    if related_serializer.Meta.model._meta.parents:
+      return False
+
+    # Writing in bulk skips the serializer's `create()` and `update()`, so they
+    # must not be overridden.
+    serializer_class = type(related_serializer)
+
+    if (
+      serializer_class.create is not ModelSerializer.create or
+      serializer_class.update is not ModelSerializer.update
+    ):
+      return False
+
+    # The validated data is assigned to the model as is, so every writable
+    # field has to be a concrete model field. This rules out many-to-many
+    # relations as well as extra fields.
+    concrete_field_names = set(
+      model_field.name
+      for model_field in related_serializer.Meta.model._meta.concrete_fields
+    )
+
+    return all(
+      field.source in concrete_field_names
+      for field in related_serializer.fields.values()
+      if field.read_only is False
+    )
+
+  def _has_save_hooks(self, related_model):
+    # Writing in bulk neither calls `Model.save()` nor sends the save signals.
+    # Receivers may be connected at any time, so this is checked on every
+    # write.
+    return (
+      related_model.save is not Model.save or
+      pre_save.has_listeners(related_model) is True or
+      post_save.has_listeners(related_model) is True
+    )
+
+  def _has_static_fields(self, related_serializer):
+    # DRF generates a model serializer's fields from its class alone. Any
+    # override of the methods involved may make them depend on the context, the
+    # instance or the request, so they can't be shared between instances.
+    serializer_class = type(related_serializer)
+
+    return all(
+      getattr(serializer_class, name) is getattr(ModelSerializer, name)
+      for name in _FIELD_BUILDING_ATTRIBUTES
+    )
+
+  def _get_relational_fields(self):
+    return self._resolved_embedded
+
+  def _is_embedded(self):
+    # Embedded serializers are the child of a list serializer, which in turn is
+    # a field of the parent serializer.
+    return isinstance(getattr(self.parent, "parent", None), EmbeddedMixin)
 
-  @transaction.atomic
   def create(self, data):
+    # A savepoint is only needed for the outermost serializer. It keeps errors
+    # like invalid IDs from breaking an outer transaction.
+    with transaction.atomic(savepoint=self._is_embedded() is False):
+      return self._create(data)
+
+  def _create(self, data):
     fields = self._get_relational_fields()
-    model = self.Meta.model
     object_data = {}
 
     # Iterate over all embedded fields and pop the data out, so it's not
     # processed by DRF's default serializing code.
-    for field_name, field in fields.items():
-      object_data[field_name] = data.pop(field_name, [])
+    for embedded in fields:
+      related_data_list = data.pop(embedded.name, [])
+
+      # New embedded resources can't refer to existing ones. This is checked
+      # before anything is written.
+      for related_data in related_data_list:
+        if embedded.related_pk_name in related_data:
+          raise ValidationError({
+            embedded.name: ["IDs can't be given when creating."],
+          })
+
+      object_data[embedded.name] = related_data_list
 
     # Create the instance with all the "simple" data.
     instance = super().create(data)
 
+    # Nothing else to do if there are no embedded resources at all.
+    if not any(object_data.values()):
+      return instance
+
+    batch_size = getattr(self.Meta, "embedded_bulk_batch_size", BULK_BATCH_SIZE)
+
     # Finally create all related objects.
-    for field_name, field in fields.items():
-      related_serializer = field.child
-      model_field = getattr(model, field_name)
-      related_field_name = model_field.field.name
+    for embedded in fields:
+      related_model = embedded.related_model
+      related_field_name = embedded.related_field_name
+      related_data_list = object_data[embedded.name]
 
-      for related_data in object_data[field_name]:
+      for related_data in related_data_list:
         related_data[related_field_name] = instance
-        related_serializer.create(related_data)
+
+      # Insert all related objects in one go if possible. The data has already
+      # been validated by the embedded serializer at this point.
+      if embedded.leaf is True and self._has_save_hooks(related_model) is False:
+        related_model._default_manager.bulk_create(
+          [related_model(**related_data) for related_data in related_data_list],
+          batch_size=batch_size,
+        )
+      else:
+        for related_data in related_data_list:
+          embedded.serializer.create(related_data)
 
     return instance
 
@@ -140,41 +432,57 @@ class EmbeddedMixin(object):
     serializer.
 
     Return False to prohibit deleting.
+
+    Deletable instances are dropped with a single queryset `delete()`, so an
+    overridden `Model.delete()` is not called (the `pre_delete`/`post_delete`
+    signals are still sent). If deleting depends on logic in `Model.delete()`,
+    move it into a signal handler or into this function.
     """
     return True
 
-  @transaction.atomic
   def update(self, instance, data):
+    with transaction.atomic(savepoint=self._is_embedded() is False):
+      return self._update(instance, data)
+
+  def _update(self, instance, data):
     fields = self._get_relational_fields()
-    model = self.Meta.model
     object_data = {}
 
     # Iterate over all embedded fields and pop the data out, so it's not
     # processed by DRF's default serializing code.
-    for field_name, field in fields.items():
-      field_object_data = data.pop(field_name, None)
+    for embedded in fields:
+      field_object_data = data.pop(embedded.name, None)
 
       if field_object_data is not None:
-        object_data[field_name] = field_object_data
+        object_data[embedded.name] = field_object_data
+
+    # Update the instance with all the "simple" data. If there is none, e.g.
+    # when only embedded resources are changed, saving the instance is skipped.
+    if data:
+      super().update(instance, data)
+
+    batch_size = getattr(self.Meta, "embedded_bulk_batch_size", BULK_BATCH_SIZE)
 
-    # Update the instance with all the "simple" data.
-    super().update(instance, data)
+    for embedded in fields:
+      field_name = embedded.name
 
-    for field_name, related_data_list in object_data.items():
+      if field_name not in object_data:
+        continue
+
+      related_serializer = embedded.serializer
+      related_model = embedded.related_model
+      related_field_name = embedded.related_field_name
+      related_pk_name = embedded.related_pk_name
+      related_data_list = object_data[field_name]
       creatable_data = []
       updatable_data = []
 
-      field = fields[field_name]
       instance_field = getattr(instance, field_name)
 
-      # Fetch all related instances and index by PK.
-      related_instances = dict([
-          (related_instance.pk, related_instance)
-          for related_instance in instance_field.all()
-      ])
-
-      model_field = getattr(model, field_name)
-      related_field_name = model_field.field.name
+      # This loop runs for every embedded resource, so lookups are bound to
+      # locals.
+      creatable_append = creatable_data.append
+      updatable_append = updatable_data.append
 
       for related_data in related_data_list:
         # Set the related field in the embedded resource to ourself, because we
@@ -184,34 +492,131 @@ class EmbeddedMixin(object):
         # Add data to be serialized into list to delay creation. New instances
         # with the same primary key might be created at this point, where old
         # ones have to be dropped at first.
-        related_id = related_data.pop("id", None)
+        related_id = related_data.pop(related_pk_name, None)
 
         if related_id is None:
-          creatable_data.append(related_data)
+          creatable_append(related_data)
         else:
-          related_instance = related_instances.pop(related_id)
-          updatable_data.append((related_instance, related_data))
+          updatable_append((related_id, related_data))
+
+      # Fetch only the related instances that are going to be updated and index
+      # them by PK. The IDs have to belong to our embedded resources, and each
+      # one may only be given once.
+      updatable_ids = [related_id for related_id, _ in updatable_data]
+      related_instances = instance_field.filter(pk__in=updatable_ids).in_bulk()
+      pop_related_instance = related_instances.pop
+
+      for index, (related_id, related_data) in enumerate(updatable_data):
+        related_instance = pop_related_instance(related_id, None)
+
+        if related_instance is None:
+          raise ValidationError({
+            field_name: ["Invalid ID {!r}.".format(related_id)],
+          })
+
+        updatable_data[index] = (related_instance, related_data)
 
       # Drop obsolete instances. Obsolete instances are all existing instances
-      # that are still left in `related_instances`. All instances that got
-      # updated were popped out from it already.
-      related_serializer = field.child
+      # that are not being updated. Unless `is_deletable()` is overridden, they
+      # are dropped without being fetched.
+      obsolete_instances = instance_field.exclude(pk__in=updatable_ids)
 
-      for obsolete_instance in related_instances.values():
-        # Check if it's allowed to delete the instance.
-        if self.is_deletable(obsolete_instance, related_serializer) is True:
-          obsolete_instance.delete()
+      if type(self).is_deletable is EmbeddedMixin.is_deletable:
+        obsolete_instances.delete()
+      else:
+        # Check which instances are allowed to be deleted and drop them all in
+        # one go.
+        deletable_ids = [
+          obsolete_instance.pk
+          for obsolete_instance in obsolete_instances
+          if self.is_deletable(obsolete_instance, related_serializer) is True
+        ]
+
+        if deletable_ids:
+          related_model._default_manager.filter(pk__in=deletable_ids).delete()
+
+      is_bulk = (
+        embedded.leaf is True and self._has_save_hooks(related_model) is False
+      )
 
       # Finally create the embedded resources.
-      for related_data in creatable_data:
-        related_serializer.create(related_data)
+      if is_bulk is True:
+        related_model._default_manager.bulk_create(
+          [related_model(**related_data) for related_data in creatable_data],
+          batch_size=batch_size,
+        )
+      else:
+        for related_data in creatable_data:
+          related_serializer.create(related_data)
 
       # Finally update the embedded resources.
-      for related_instance, related_data in updatable_data:
-        related_serializer.update(related_instance, related_data)
+      if is_bulk is True:
+        # Assign the new values and write all instances back in one go. Only
+        # the fields present in any of the data are updated. The related field
+        # always points to ourself already.
+        updated_fields = set()
+
+        for related_instance, related_data in updatable_data:
+          for attr, value in related_data.items():
+            setattr(related_instance, attr, value)
+
+          updated_fields.update(related_data.keys())
+
+        updated_fields.discard(related_field_name)
+
+        # `bulk_update()` doesn't call `Field.pre_save()` like `save()` does,
+        # so `auto_now` fields are refreshed here.
+        for model_field in related_model._meta.concrete_fields:
+          if getattr(model_field, "auto_now", False) is True:
+            for related_instance, _ in updatable_data:
+              model_field.pre_save(related_instance, add=False)
+
+            updated_fields.add(model_field.name)
+
+        if updated_fields and updatable_data:
+          related_model._default_manager.bulk_update(
+            [related_instance for related_instance, _ in updatable_data],
+            fields=list(updated_fields),
+            batch_size=batch_size,
+          )
+      else:
+        for related_instance, related_data in updatable_data:
+          related_serializer.update(related_instance, related_data)
 
     return instance
 
+class EagerLoadingMixin(object):
+  """
+  ViewSet mixin that eagerly loads related resources by overwriting
+  `get_queryset()`. If the serializer class provides `setup_eager_loading()`,
+  like `EmbeddedMixin` does, it's used to prepare the queryset.
+
+  Only reading requests are prepared. When writing, `EmbeddedMixin.update()`
+  fetches just the embedded resources it needs, and DRF drops prefetched
+  resources before rendering the response anyway. Fields dropped by
+  `OptionalFieldsMixin` aren't loaded at all.
+  """
+
+  def get_queryset(self):
+    queryset = super().get_queryset()
+
+    if self.request.method not in SAFE_METHODS:
+      return queryset
+
+    serializer_class = self.get_serializer_class()
+
+    if issubclass(serializer_class, EmbeddedMixin) is True:
+      if hasattr(self, "get_dropped_fields") is True:
+        dropped_fields = self.get_dropped_fields()
+      else:
+        dropped_fields = ()
+
+      queryset = serializer_class.setup_eager_loading(queryset, dropped_fields)
+    elif hasattr(serializer_class, "setup_eager_loading") is True:
+      queryset = serializer_class.setup_eager_loading(queryset)
+
+    return queryset
+
 class OptionalFieldsMixin(object):
   """
   ViewSet mixin that allows to declare fields as optional by overwriting
@@ -229,18 +634,49 @@ class OptionalFieldsMixin(object):
   latter case, all fields are enabled.
   """
 
-  def get_serializer(self, *args, **kwargs):
-    serializer = super().get_serializer(*args, **kwargs)
+  def _get_optional_fields(self):
+    optional_fields = getattr(self, "optional_fields", ())
+    cls = type(self)
+
+    # Optional fields passed to `as_view()` are set on the instance and can't
+    # be cached.
+    if optional_fields is not getattr(cls, "optional_fields", None):
+      return frozenset(optional_fields)
+
+    # Otherwise the set is only built once per ViewSet class. It's stored in
+    # the class' own `__dict__` along with the list it was built from, so
+    # neither subclasses nor reassigned `optional_fields` get a stale set.
+    cached = cls.__dict__.get("_optional_fields_set")
 
+    if cached is None or cached[0] is not optional_fields:
+      cached = (optional_fields, frozenset(optional_fields))
+      cls._optional_fields_set = cached
+
+    return cached[1]
+
+  def get_dropped_fields(self):
+    """
+    Return the optional fields that weren't requested by the caller and are
+    dropped from the response.
+    """
     # If the user is writing, all fields are enabled.
     if self.request.method in ("PUT", "PATCH", "POST"):
-      included_fields = ("*",)
+      return frozenset()
     elif "include" in self.request.GET:
       included_fields = self.request.GET["include"].split(",")
     else:
       included_fields = ()
 
-    if "*" not in included_fields:
+    if "*" in included_fields:
+      return frozenset()
+
+    return self._get_optional_fields().difference(included_fields)
+
+  def get_serializer(self, *args, **kwargs):
+    serializer = super().get_serializer(*args, **kwargs)
+    dropped_fields = self.get_dropped_fields()
+
+    if dropped_fields:
       # Make sure to get the real serializer, not ListSerializer, which is the
       # case for `many=True` fields.
       if isinstance(serializer, ListSerializer) is True:
@@ -248,15 +684,12 @@ class OptionalFieldsMixin(object):
       else:
         field_serializer = serializer
 
-      serializer_fields = field_serializer.fields.keys()
-      optional_fields = getattr(self, "optional_fields", [])
-
-      remaining_fields = (
-        serializer_fields &
-        (set(optional_fields) - set(included_fields))
-      )
+      serializer_fields = field_serializer.fields
+      remaining_fields = serializer_fields.keys() & dropped_fields
 
+      # Deleting from DRF's `BindingDict` is a plain dict deletion, so this is
+      # cheaper than rebuilding the fields, which would bind them again.
       for field in remaining_fields:
-        del field_serializer.fields[field]
+        del serializer_fields[field]
 
     return serializer